@@ -0,0 +1,99 @@
+import numpy as np
+
+from fills import NO_COSTS
+
+HOLD = 0
+BUY = 1
+SELL = -1
+
+SIGNAL_CODES = {"hold": HOLD, "buy": BUY, "sell": SELL}
+
+
+def mean_reversion_signals(close, mean, std, risk=None):
+    # Vectorized twin of main.mean_reversion_strategy, NaN std compares as hold
+    close = np.atleast_2d(close)
+    signal = np.full(close.shape, HOLD, dtype="int8")
+    signal[close < mean - std] = BUY
+    if risk is None:
+        signal[close > mean + std] = SELL
+    return signal
+
+
+def simulate(
+    close,
+    signal,
+    risk=None,
+    initial_balance=10_00_000,
+    fill_model=None,
+    volume=None,
+    timestamps=None,
+    interval=None,
+):
+    """
+    Replays the run_strat accounting over a batch of price paths at once.
+
+    `close`, `signal` and the optional `volume` are (paths, bars) arrays and
+    `timestamps` holds the bar open times in epoch ms, which funding needs. The
+    loop walks the bars and updates every path per step. A path that runs out
+    of balance stops trading like the `break` in run_strat, but keeps being
+    marked to market. Fills pay the fees, slippage and funding of `fill_model`,
+    or nothing at all when it is None. Funding shrinks the position rather than
+    the cash, so balance never goes negative.
+    Returns (balance, position, equity), equity being (paths, bars).
+    """
+    close = np.atleast_2d(np.asarray(close, dtype="float64"))
+    signal = np.atleast_2d(signal)
+    n_paths, n_bars = close.shape
+
+    fill_model = fill_model or NO_COSTS
+    fee = fill_model.fee_rate
+    liquidity = fill_model.liquidity(close, volume)
+    funding = fill_model.funding_schedule(n_bars, timestamps, interval)
+
+    balance = np.full(n_paths, float(initial_balance))
+    position = np.zeros(n_paths)
+    active = np.ones(n_paths, dtype=bool)
+    equity = np.empty((n_paths, n_bars))
+
+    for i in range(n_bars):
+        price = close[:, i]
+        bar_liquidity = None if liquidity is None else liquidity[:, i]
+
+        buy = active & (signal[:, i] == BUY)
+        if risk is not None:
+            broke = buy & (balance - risk < 0)
+            active &= ~broke
+            buy &= ~broke
+            notional = np.full(n_paths, float(risk))
+        else:
+            # All-in sizing; a path already fully invested has nothing to buy with
+            notional = np.maximum(balance, 0.0)
+            buy &= notional > 0
+        fill_price = price * (1 + fill_model.slippage(notional, bar_liquidity))
+        bought = notional * (1 - fee) / fill_price
+        if risk is not None:
+            position = np.where(buy, position + bought, position)
+            balance = np.where(buy, balance - risk, balance)
+        else:
+            position = np.where(buy, bought, position)
+            balance = np.where(buy, 0.0, balance)
+
+        sell = active & (signal[:, i] == SELL) & (position > 0)
+        notional = position * price
+        fill_price = price * (1 - fill_model.slippage(notional, bar_liquidity))
+        balance = np.where(sell, position * fill_price * (1 - fee), balance)
+        position = np.where(sell, 0.0, position)
+
+        if funding[i]:
+            # Paid out of the position, all-in paths hold no cash to pay it from
+            position = position * (1 - funding[i])
+
+        equity[:, i] = balance + position * price
+
+    return balance, position, equity
+
+
+def max_drawdown(equity):
+    equity = np.atleast_2d(equity)
+    peak = np.maximum.accumulate(equity, axis=1)
+    return np.max(1 - equity / peak, axis=1)
@@ -0,0 +1,84 @@
+import numpy as np
+
+from klines import interval_ms
+
+FUNDING_PERIOD_MS = 8 * 3_600_000
+
+
+class FillModel:
+    """
+    Costs applied to simulated fills: exchange fees, volume-based slippage and
+    futures funding.
+
+    Slippage follows a square-root impact model, the fill moves against us by
+    `impact * sqrt(order notional / bar notional volume)` capped at
+    `max_slippage`. Funding is taken out of the open long position at every
+    settlement, each `funding_period` ms from 00:00 UTC (00/08/16 UTC).
+    """
+
+    def __init__(
+        self,
+        maker_fee: float = 0.0002,
+        taker_fee: float = 0.0005,
+        maker: bool = False,
+        impact: float = 0.1,
+        max_slippage: float = 0.01,
+        funding_rate: float = 0.0001,
+        funding_period: int = FUNDING_PERIOD_MS,
+    ):
+        self.maker_fee = maker_fee
+        self.taker_fee = taker_fee
+        self.maker = maker
+        self.impact = impact
+        self.max_slippage = max_slippage
+        self.funding_rate = funding_rate
+        self.funding_period = funding_period
+
+    @property
+    def fee_rate(self):
+        return self.maker_fee if self.maker else self.taker_fee
+
+    def liquidity(self, close, volume):
+        # Bar notional traded; NaN where there is no volume so slippage hits the cap
+        if volume is None:
+            return None
+        liquidity = np.asarray(close, dtype="float64") * np.asarray(volume)
+        return np.where(liquidity > 0, liquidity, np.nan)
+
+    def slippage(self, notional, liquidity):
+        if liquidity is None:
+            return np.zeros_like(notional, dtype="float64")
+        # Nothing to fill at a non-positive notional, and sqrt must not see it
+        slip = self.impact * np.sqrt(np.maximum(notional, 0.0) / liquidity)
+        return np.minimum(np.nan_to_num(slip, nan=self.max_slippage), self.max_slippage)
+
+    def funding_schedule(self, n_bars, timestamps=None, interval=None):
+        """
+        Funding rate charged at each bar close, from the bar open times in
+        epoch ms. A bar pays once for every settlement (00/08/16 UTC by
+        default) that falls within (open, close].
+        """
+        if not self.funding_rate:
+            return np.zeros(n_bars)
+        if timestamps is None:
+            raise ValueError("Funding needs the bar timestamps")
+        timestamps = np.asarray(timestamps, dtype="int64")
+        if interval is not None:
+            step = interval_ms(interval)
+        else:
+            step = int(np.median(np.diff(timestamps)))
+        settlements = (timestamps + step) // self.funding_period - (
+            timestamps // self.funding_period
+        )
+        return settlements * self.funding_rate
+
+    def __repr__(self):
+        return (
+            f"FillModel(fee_rate={self.fee_rate}, impact={self.impact}, "
+            f"max_slippage={self.max_slippage}, funding_rate={self.funding_rate}, "
+            f"funding_period={self.funding_period})"
+        )
+
+
+# Frictionless fills, what the backtests assumed before fills were modelled
+NO_COSTS = FillModel(maker_fee=0, taker_fee=0, impact=0, max_slippage=0, funding_rate=0)
@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+
+CACHE_DIR = "./.indicator_cache"
+MAX_CACHE_BYTES = 256 * 1024 * 1024  # 256 MiB
+COLUMNS = ["mean", "std", "returns", "zscore", "skewness", "kurtosis"]
+
+
+def rolling_mean_std(close, window=24):
+    # Bars run along the last axis; pandas rolls down columns, hence the transposes
+    close = np.atleast_2d(np.asarray(close, dtype="float64"))
+    rolling = pd.DataFrame(close.T).rolling(window=window, min_periods=1)
+    return rolling.mean().to_numpy().T, rolling.std().to_numpy().T
+
+
+def compute_indicators(close, window=24, stat_window=20):
+    close = pd.Series(np.asarray(close, dtype="float64"))
+    # Shared with the robustness paths so both backtests see the same bands
+    mean, std = (pd.Series(band[0]) for band in rolling_mean_std(close, window))
+    returns = close.pct_change()
+    return pd.DataFrame(
+        {
+            "mean": mean,
+            "std": std,
+            "returns": returns,
+            "zscore": (close - mean) / std,
+            "skewness": returns.rolling(window=stat_window).apply(stats.skew, raw=True),
+            "kurtosis": returns.rolling(window=stat_window).apply(
+                stats.kurtosis, raw=True
+            ),
+        }
+    )
+
+
+def fingerprint(close):
+    close = np.ascontiguousarray(close, dtype="float64")
+    digest = hashlib.sha1(close.tobytes()).hexdigest()
+    return f"{len(close)}-{digest}"
+
+
+class IndicatorCache:
+    """
+    On-disk cache of the rolling indicators used by the backtests.
+
+    Every entry is a single .npy file holding the close series followed by the
+    indicator columns, keyed by the close fingerprint and the window params.
+    Indicators only ever look backwards, so a cached longer series answers any
+    of its prefixes and a cached prefix is extended by recomputing just the
+    newly appended bars (plus enough lookback to fill the windows).
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, "index.json")
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index = self._load_index()
+
+    def get(self, close, window=24, stat_window=20):
+        close = np.ascontiguousarray(close, dtype="float64")
+        params = f"w{window}-s{stat_window}"
+        key = f"{params}-{fingerprint(close)}"
+
+        entry = self.index.get(key)
+        if entry is not None:
+            stored = self._read(key)
+            if stored is not None:
+                self._touch(key)
+                return self._to_frame(stored)
+
+        candidates = [
+            (k, e)
+            for k, e in self.index.items()
+            if e["params"] == params and len(close) and e["first"] == close[0]
+        ]
+        # Longest first: the best superset to slice, or the longest prefix to extend
+        candidates.sort(key=lambda item: item[1]["length"], reverse=True)
+
+        for cached_key, cached in candidates:
+            if cached["length"] < len(close):
+                continue
+            stored = self._read(cached_key)
+            if stored is not None and np.array_equal(
+                stored[: len(close), 0], close, equal_nan=True
+            ):
+                self._touch(cached_key)
+                return self._to_frame(stored[: len(close)])
+
+        for cached_key, cached in candidates:
+            length = cached["length"]
+            if length >= len(close):
+                continue
+            stored = self._read(cached_key)
+            if stored is None or not np.array_equal(
+                stored[:, 0], close[:length], equal_nan=True
+            ):
+                continue
+            start = max(0, length - max(window, stat_window + 1))
+            tail = compute_indicators(close[start:], window, stat_window)
+            tail = tail.iloc[length - start :][COLUMNS].to_numpy()
+            tail = np.column_stack([close[length:], tail])
+            values = np.vstack([stored, tail])
+            # The extended entry answers every query the prefix did
+            self._remove(cached_key)
+            self._write(key, params, values)
+            return self._to_frame(values)
+
+        indicators = compute_indicators(close, window, stat_window)
+        values = np.column_stack([close, indicators[COLUMNS].to_numpy()])
+        self._write(key, params, values)
+        return self._to_frame(values)
+
+    def clear(self):
+        for key in list(self.index):
+            self._remove(key)
+        self._save_index()
+
+    def _to_frame(self, values):
+        return pd.DataFrame(values[:, 1:], columns=COLUMNS)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npy")
+
+    def _read(self, key):
+        try:
+            return np.load(self._path(key))
+        except (FileNotFoundError, ValueError, OSError):
+            self.index.pop(key, None)
+            return None
+
+    def _write(self, key, params, values):
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, values)
+        os.replace(tmp_path, path)
+        self.index[key] = {
+            "params": params,
+            "length": len(values),
+            "first": float(values[0, 0]) if len(values) else None,
+            "size": os.path.getsize(path),
+            "last_used": time.time(),
+        }
+        self._evict()
+        self._save_index()
+
+    def _remove(self, key):
+        self.index.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _touch(self, key):
+        self.index[key]["last_used"] = time.time()
+        self._save_index()
+
+    def _evict(self):
+        total = sum(entry["size"] for entry in self.index.values())
+        by_age = sorted(self.index.items(), key=lambda item: item[1]["last_used"])
+        # Never evict the newest entry, even if it alone exceeds the budget
+        for key, entry in by_age[:-1]:
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= entry["size"]
+
+    def _load_index(self):
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_index(self):
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+
+
+_default_cache = None
+
+
+def cached_indicators(close, window=24, stat_window=20):
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = IndicatorCache()
+    return _default_cache.get(close, window, stat_window)
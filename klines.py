@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+
+COLUMNS = ["Timestamp", "Open", "High", "Low", "Close", "Volume"]
+# fetcher.fetch used to write local-time strings; the bundled CSV is in IST
+LEGACY_TZ = "Asia/Kolkata"
+
+INTERVAL_MS = {
+    "1m": 60_000,
+    "3m": 3 * 60_000,
+    "5m": 5 * 60_000,
+    "15m": 15 * 60_000,
+    "30m": 30 * 60_000,
+    "1h": 3_600_000,
+    "2h": 2 * 3_600_000,
+    "4h": 4 * 3_600_000,
+    "6h": 6 * 3_600_000,
+    "8h": 8 * 3_600_000,
+    "12h": 12 * 3_600_000,
+    "1d": 86_400_000,
+    "1w": 7 * 86_400_000,
+}
+
+
+def interval_ms(interval):
+    if isinstance(interval, (int, np.integer)):
+        return int(interval)
+    try:
+        return INTERVAL_MS[interval]
+    except KeyError:
+        raise ValueError(f"Unknown interval {interval!r}") from None
+
+
+def to_epoch_ms(timestamps, tz=LEGACY_TZ):
+    """
+    Converts a timestamp column to int64 epoch milliseconds in one pass.
+
+    Legacy CSVs hold naive "%Y-%m-%d %H:%M:%S" strings in the local time of the
+    machine that fetched them, so they are localized to `tz` before converting.
+    """
+    timestamps = pd.Series(timestamps)
+    if pd.api.types.is_numeric_dtype(timestamps):
+        return timestamps.astype("int64")
+    parsed = pd.to_datetime(timestamps, format="%Y-%m-%d %H:%M:%S")
+    utc = parsed.dt.tz_localize(tz, ambiguous="infer").dt.tz_convert("UTC")
+    return utc.dt.tz_localize(None).astype("datetime64[ms]").astype("int64")
+
+
+def from_binance(raw):
+    # Binance klines are lists: [open time, open, high, low, close, volume, ...]
+    if not raw:
+        return pd.DataFrame(columns=COLUMNS)
+    values = np.asarray([kline[:6] for kline in raw], dtype="float64")
+    df = pd.DataFrame(values, columns=COLUMNS)
+    df["Timestamp"] = values[:, 0].astype("int64")
+    return df
+
+
+def from_pi42(raw):
+    # Pi42 klines are dicts keyed by startTime/endTime/open/high/low/close/volume
+    df = pd.DataFrame(raw, columns=["startTime", *map(str.lower, COLUMNS[1:])])
+    df = df.apply(pd.to_numeric)
+    df.columns = COLUMNS
+    df["Timestamp"] = df["Timestamp"].astype("int64")
+    return df
+
+
+def load_csv(path, tz=LEGACY_TZ):
+    df = pd.read_csv(path)
+    df["Timestamp"] = to_epoch_ms(df["Timestamp"], tz)
+    return df
+
+
+def find_gaps(timestamps, step):
+    """
+    Returns one row per hole in the grid with the last bar before it, the
+    first bar after it and how many bars are missing in between.
+    """
+    timestamps = np.asarray(timestamps, dtype="int64")
+    deltas = np.diff(timestamps)
+    holes = np.flatnonzero(deltas > step)
+    return pd.DataFrame(
+        {
+            "after": timestamps[holes],
+            "before": timestamps[holes + 1],
+            "missing": deltas[holes] // step - 1,
+        }
+    )
+
+
+def repair(df, interval, fill=True):
+    """
+    Puts klines on a regular grid of `interval` bars starting at the first bar.
+
+    Bars are sorted, snapped to the nearest grid slot and de-duplicated keeping
+    the last copy (the most recent fetch). Missing bars are added and flagged in
+    the `filled` column; with `fill` they become flat bars at the previous close
+    with zero volume, otherwise their prices stay NaN.
+    """
+    step = interval_ms(interval)
+    df = df.sort_values("Timestamp", kind="stable")
+    if df.empty:
+        return df.assign(filled=pd.Series(dtype=bool))
+
+    timestamps = df["Timestamp"].to_numpy(dtype="int64")
+    start = timestamps[0]
+    slots = np.rint((timestamps - start) / step).astype("int64")
+    keep = np.append(slots[1:] != slots[:-1], True)
+    df = df[keep].set_index(slots[keep])
+
+    grid = np.arange(slots[-1] + 1)
+    df = df.reindex(grid)
+    filled = df["Close"].isna().to_numpy()
+    df["Timestamp"] = start + grid * step
+    if fill:
+        df["Close"] = df["Close"].ffill()
+        for column in ["Open", "High", "Low"]:
+            df[column] = df[column].fillna(df["Close"])
+        df["Volume"] = df["Volume"].fillna(0.0)
+    df["filled"] = filled
+
+    duplicates = len(keep) - int(keep.sum())
+    if duplicates or filled.any():
+        print(
+            f"Repaired klines: {duplicates} duplicate and {filled.sum()} missing bars"
+        )
+    return df.reset_index(drop=True)
+
+
+def resample(df, interval, source=None):
+    """
+    Aggregates klines into coarser, epoch-aligned `interval` bars.
+
+    `source` is the input interval, inferred from the median bar spacing when
+    omitted. Each output bar carries the number of input bars it was built
+    from in `bars` and whether that is a full bucket in `complete`, so partial
+    buckets at the edges or around gaps are not mistaken for real bars.
+    Finer intervals raise ValueError, the data to build them does not exist.
+    """
+    step = interval_ms(interval)
+    timestamps = df["Timestamp"].to_numpy(dtype="int64")
+    if source is not None:
+        source = interval_ms(source)
+    elif len(df) > 1:
+        source = int(np.median(np.diff(timestamps)))
+    else:
+        raise ValueError("Pass `source` to resample fewer than two bars")
+    if step < source:
+        raise ValueError(f"Cannot resample {source} ms bars to finer {step} ms bars")
+
+    bucket = timestamps // step * step
+    aggregations = {
+        "Open": "first",
+        "High": "max",
+        "Low": "min",
+        "Close": "last",
+        "Volume": "sum",
+    }
+    if "filled" in df:
+        aggregations["filled"] = "all"
+    grouped = df.groupby(bucket, sort=True)
+    out = grouped.agg(aggregations)
+    out["bars"] = grouped.size()
+    out["complete"] = out["bars"] == step // source
+    out.insert(0, "Timestamp", out.index.astype("int64"))
+    return out.reset_index(drop=True)
@@ -5,14 +5,18 @@ import os
 import time
 from os import getenv
 
+import numpy as np
 import pandas as pd
 import requests
-import scipy.stats as stats
 from dotenv import load_dotenv
 from icecream import ic
 
+from backtest import HOLD, SIGNAL_CODES, simulate
 from enums import OrderParams
 from fetcher import fetch
+from fills import FillModel
+from indicator_cache import cached_indicators
+from klines import load_csv, repair
 
 
 def generate_signature(api_secret, data_to_sign):
@@ -113,7 +117,7 @@ def mean_reversion_strategy(Close, mean, std, zscore, skewness, kurtosis, date,
     return sign
 
 
-def run_strat(interval=default_interval, risk=None):
+def run_strat(interval=default_interval, risk=None, fill_model=None):
     # Fetch historical data
     response = requests.post(
         f"{base_url}/v1/market/klines",
@@ -131,35 +135,35 @@ def run_strat(interval=default_interval, risk=None):
     print(f"\n\n{response.status_code=}\n{len(response.json())=}\n\n")
     response.raise_for_status()
     data = response.json()
-    data = pd.read_csv("./btc.csv")
+    data = load_csv("./btc.csv")
 
     ic(data)
-    # Calculate mean and standard deviation
-    df = pd.DataFrame(data)
+    # Rolling windows assume a regular grid, so fill gaps and drop duplicate bars
+    df = repair(data, interval)
     df["Close"] = pd.to_numeric(df["Close"])
-    mean = df["Close"].rolling(window=24, min_periods=1).mean()
-    std = df["Close"].rolling(window=24, min_periods=1).std()
 
     # print(f" ###########\n\n\n {df.head()=} ###########\n\n\n ")
 
-    # Calculate additional metrics
-    df["returns"] = df["Close"].pct_change()
-    df["zscore"] = (df["Close"] - mean) / std
-    df["skewness"] = (
-        df["returns"].rolling(window=20).apply(lambda x: stats.skew(x), raw=False)
-    )
-    df["kurtosis"] = (
-        df["returns"].rolling(window=20).apply(lambda x: stats.kurtosis(x), raw=False)
-    )
+    # Rolling metrics come from the on-disk cache, so only new bars get computed
+    indicators = cached_indicators(df["Close"], window=24, stat_window=20)
+    indicators.index = df.index
+    mean = indicators["mean"]
+    std = indicators["std"]
+    df["returns"] = indicators["returns"]
+    df["zscore"] = indicators["zscore"]
+    df["skewness"] = indicators["skewness"]
+    df["kurtosis"] = indicators["kurtosis"]
 
     initial_balance = 10_00_000  # Example initial balance in INR
-    balance = initial_balance
     initial_price = df["Close"].iloc[0]
-    position = 0
-    entry_price = 0
 
     ic(df)
+    signals = np.empty(len(df), dtype="int8")
     for i in range(len(df)):
+        if df["filled"].iloc[i]:
+            # Synthetic bar from repair(), nothing traded at this price
+            signals[i] = HOLD
+            continue
         Close = df["Close"].iloc[i]
         zscore = df["zscore"].iloc[i]
         skewness = df["skewness"].iloc[i]
@@ -171,22 +175,21 @@ def run_strat(interval=default_interval, risk=None):
         signal = mean_reversion_strategy(
             Close, mean.iloc[i], std.iloc[i], zscore, skewness, kurtosis, date, risk
         )
-        if signal == "buy":
-            if risk is not None:
-                print(f"{position=}")
-                if balance - risk < 0:
-                    break
-                position += float(risk / Close)
-            elif risk is None:
-                position = float(balance / Close)
-
-            entry_price = Close
-            balance = (0) if risk is None else (balance - risk)
-            # print("Buy signal")
-        elif signal == "sell" and position > 0:
-            balance = position * Close
-            position = 0
-            # print("Sell signal")
+        signals[i] = SIGNAL_CODES[signal]
+
+    # Same accounting the robustness paths use, on a batch of one
+    volume = pd.to_numeric(df["Volume"]).to_numpy() if "Volume" in df else None
+    balance, position, _ = simulate(
+        df["Close"].to_numpy(),
+        signals,
+        risk=risk,
+        initial_balance=initial_balance,
+        fill_model=fill_model,
+        volume=volume,
+        timestamps=df["Timestamp"].to_numpy(),
+        interval=interval,
+    )
+    balance, position = balance[0], position[0]
 
     # Calculate final profit/loss
     final_balance = balance + position * df["Close"].iloc[-1]
@@ -209,8 +212,9 @@ def delete_file(file_path):
         print(f"file {file_path} is already deleted")
 
 
-delete_file("trading_signals.csv")
-delete_file("./btc.csv")
-fetch()
-run_strat("1h", risk=500)
+if __name__ == "__main__":
+    delete_file("trading_signals.csv")
+    delete_file("./btc.csv")
+    fetch()
+    run_strat("1h", risk=500, fill_model=FillModel())
 # plotter.plot("./trading_signals.csv")
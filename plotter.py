@@ -9,7 +9,11 @@ def plot(csv_path: str):
     # print(f" ###########\n\n\n {df.head()=} ###########\n\n\n ")
     # Convert date column to datetime
     if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"])
+        # Dates are logged as int64 epoch ms, older logs as formatted strings
+        if pd.api.types.is_numeric_dtype(df["date"]):
+            df["date"] = pd.to_datetime(df["date"], unit="ms")
+        else:
+            df["date"] = pd.to_datetime(df["date"])
 
     # Handle missing values
 
@@ -0,0 +1,99 @@
+import time
+from collections import deque
+
+
+class RiskLimits:
+    def __init__(
+        self,
+        max_position: float = 1.0,
+        max_notional: float = 50_000,
+        max_orders_per_minute: int = 5,
+        max_drawdown: float = 0.05,
+    ):
+        # The rate check keeps the last N order times, N has to be at least 1
+        if not isinstance(max_orders_per_minute, int) or max_orders_per_minute < 1:
+            raise ValueError(
+                f"max_orders_per_minute must be a positive integer, "
+                f"got {max_orders_per_minute!r}"
+            )
+        self.max_position = max_position  # in units of the traded asset
+        self.max_notional = max_notional  # in INR
+        self.max_orders_per_minute = max_orders_per_minute
+        self.max_drawdown = max_drawdown  # fraction of the equity high-water mark
+
+    def __repr__(self):
+        return (
+            f"RiskLimits(max_position={self.max_position}, "
+            f"max_notional={self.max_notional}, "
+            f"max_orders_per_minute={self.max_orders_per_minute}, "
+            f"max_drawdown={self.max_drawdown})"
+        )
+
+
+class RiskGuard:
+    """
+    Pre-trade checks that sit inline on the order path.
+
+    Every check is O(1): the drawdown floor is recomputed only when the equity
+    high-water mark moves, and the order rate uses a deque holding just the
+    last `max_orders_per_minute` order times. Breaching the drawdown limit
+    trips the kill switch, which calls `flatten` once and blocks new orders
+    until `reset` is called.
+    """
+
+    def __init__(self, limits: RiskLimits, flatten=None, clock=time.monotonic):
+        self.limits = limits
+        self.flatten = flatten
+        self.clock = clock
+        self.order_times = deque(maxlen=limits.max_orders_per_minute)
+        self.high_water = None
+        self.equity_floor = float("-inf")
+        self.killed = False
+        self.rejected = 0
+
+    def check_order(self, quantity, price, position):
+        """Returns None if a buy may go out, else the reason it was rejected."""
+        reason = None
+        new_position = position + quantity
+        if self.killed:
+            reason = "kill switch active"
+        elif new_position > self.limits.max_position:
+            reason = f"position {new_position} > {self.limits.max_position}"
+        elif new_position * price > self.limits.max_notional:
+            reason = f"notional {new_position * price:.2f} > {self.limits.max_notional}"
+        else:
+            now = self.clock()
+            if (
+                len(self.order_times) == self.order_times.maxlen
+                and now - self.order_times[0] < 60
+            ):
+                reason = f"more than {self.limits.max_orders_per_minute} orders/min"
+            else:
+                self.order_times.append(now)
+
+        if reason is not None:
+            self.rejected += 1
+        return reason
+
+    def update_equity(self, equity):
+        """Tracks the high-water mark, returns True if this update tripped the guard."""
+        if self.high_water is None or equity > self.high_water:
+            self.high_water = equity
+            self.equity_floor = equity * (1 - self.limits.max_drawdown)
+        if self.killed or equity >= self.equity_floor:
+            return False
+
+        self.killed = True
+        print(
+            f"Risk guard tripped: equity {equity:.2f} fell more than "
+            f"{self.limits.max_drawdown:.2%} below {self.high_water:.2f}"
+        )
+        if self.flatten is not None:
+            self.flatten()
+        return True
+
+    def reset(self):
+        self.killed = False
+        self.high_water = None
+        self.equity_floor = float("-inf")
+        self.order_times.clear()
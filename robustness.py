@@ -0,0 +1,145 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from backtest import max_drawdown, mean_reversion_signals, simulate
+from fills import FillModel
+from indicator_cache import rolling_mean_std
+from klines import load_csv
+
+PERCENTILES = [1, 5, 25, 50, 75, 95, 99]
+
+
+def block_bootstrap(n_obs, n_paths, n_bars, block_size, rng):
+    # Stitch random contiguous blocks so volatility clustering survives resampling
+    block_size = min(block_size, n_obs)
+    n_blocks = -(-n_bars // block_size)
+    starts = rng.integers(0, n_obs - block_size + 1, size=(n_paths, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block_size)).reshape(n_paths, -1)
+    return idx[:, :n_bars]
+
+
+def _run_batch(
+    n_paths,
+    seed,
+    close,
+    volume,
+    timestamps,
+    interval,
+    block_size,
+    risk,
+    window,
+    balance,
+    fills,
+):
+    rng = np.random.default_rng(seed)
+    returns = close[1:] / close[:-1] - 1
+    idx = block_bootstrap(len(returns), n_paths, len(close) - 1, block_size, rng)
+    paths = np.empty((n_paths, len(close)))
+    paths[:, 0] = close[0]
+    paths[:, 1:] = close[0] * np.cumprod(1 + returns[idx], axis=1)
+
+    # Each resampled return keeps the volume of the bar it closed on
+    path_volume = None
+    if volume is not None:
+        path_volume = np.empty_like(paths)
+        path_volume[:, 0] = volume[0]
+        path_volume[:, 1:] = volume[idx + 1]
+
+    mean, std = rolling_mean_std(paths, window)
+    signal = mean_reversion_signals(paths, mean, std, risk)
+    # Only prices are resampled, path bars keep the calendar of the source bars
+    _, _, equity = simulate(
+        paths, signal, risk, balance, fills, path_volume, timestamps, interval
+    )
+    return equity[:, -1], max_drawdown(equity)
+
+
+def run_robustness(
+    close,
+    n_paths=5000,
+    block_size=24,
+    risk=None,
+    seed=42,
+    batch_size=250,
+    workers=None,
+    window=24,
+    initial_balance=10_00_000,
+    fill_model=None,
+    volume=None,
+    timestamps=None,
+    interval=None,
+):
+    """
+    Block-bootstraps the close series into `n_paths` synthetic histories and
+    backtests each of them with the run_strat logic.
+
+    Paths are generated and simulated in (batch_size, bars) batches spread over
+    a process pool. Each batch gets its own child of SeedSequence(seed), so the
+    results only depend on `seed` and `batch_size`, not on the worker count.
+    Returns a DataFrame with one row per path: profit_loss, pnl_pct, max_drawdown.
+    """
+    if n_paths < 1:
+        raise ValueError(f"n_paths must be at least 1, got {n_paths}")
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+    close = np.asarray(close, dtype="float64")
+    if volume is not None:
+        volume = np.asarray(volume, dtype="float64")
+
+    sizes = [batch_size] * (n_paths // batch_size)
+    if n_paths % batch_size:
+        sizes.append(n_paths % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    run_batch = partial(
+        _run_batch,
+        close=close,
+        volume=volume,
+        timestamps=timestamps,
+        interval=interval,
+        block_size=block_size,
+        risk=risk,
+        window=window,
+        balance=initial_balance,
+        fills=fill_model,
+    )
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        batches = list(pool.map(run_batch, sizes, seeds))
+
+    final_equity = np.concatenate([final for final, _ in batches])
+    drawdown = np.concatenate([dd for _, dd in batches])
+    profit_loss = final_equity - initial_balance
+    return pd.DataFrame(
+        {
+            "profit_loss": profit_loss,
+            "pnl_pct": profit_loss / initial_balance * 100,
+            "max_drawdown": drawdown * 100,
+        }
+    )
+
+
+def summarize(results):
+    summary = results[["pnl_pct", "max_drawdown"]].describe(
+        percentiles=[p / 100 for p in PERCENTILES]
+    )
+    # In percent like the rest of the pnl_pct column
+    summary.loc["P(loss) %"] = [(results["pnl_pct"] < 0).mean() * 100, np.nan]
+    return summary
+
+
+if __name__ == "__main__":
+    data = load_csv("./btcusdt_1hr_klines.csv")
+    results = run_robustness(
+        data["Close"].to_numpy(),
+        n_paths=2000,
+        risk=500,
+        fill_model=FillModel(),
+        volume=data["Volume"].to_numpy(),
+        timestamps=data["Timestamp"].to_numpy(),
+        interval="1h",
+    )
+    print(summarize(results).to_string(float_format=lambda x: f"{x:.4f}"))
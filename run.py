@@ -2,14 +2,22 @@ import hashlib
 import hmac
 import json
 import os
+import sys
 import time
 
+import numpy as np
 import pandas as pd
 import requests
 from dotenv import load_dotenv
 from icecream import ic
 from scipy.stats import kurtosis, skew
 
+from klines import find_gaps, interval_ms
+from risk_guard import RiskGuard, RiskLimits
+
+RISK = 30  # INR committed per buy signal
+CATCH_UP_BARS = 5  # bars requested per poll, covers a few missed polls
+
 
 def generate_signature(api_secret, data_to_sign):
     # ic(data_to_sign)
@@ -21,7 +29,7 @@ def generate_signature(api_secret, data_to_sign):
 
 
 class TradingBot:
-    def __init__(self, restrict_sell=False):
+    def __init__(self, restrict_sell=False, risk_limits=None):
         load_dotenv()
         self.base_url = "https://fapi.pi42.com"
         self.api_key = os.getenv("PI42_API_KEY")
@@ -33,6 +41,8 @@ class TradingBot:
         self.position = 0
         self.entry_price = 0
         self.historical_data = pd.DataFrame(columns=["close"])
+        self.last_close = 0
+        self.risk_guard = RiskGuard(risk_limits or RiskLimits(), self.flatten_all)
 
     def get_user_balance(self):
         if True:
@@ -132,11 +142,15 @@ class TradingBot:
             print(f"An unexpected error occurred: {str(e)}")
             return False
 
-    def fetch_real_time_data(self):
+    def fetch_real_time_data(self, last_end=None):
         base_url = "https://api.pi42.com"
         symbol = "ETHINR"
         interval = "1m"  # Real-time data interval
 
+        step = interval_ms(interval)
+        # Tracked here rather than via historical_data so the market-data worker,
+        # which never computes metrics, streams the same ticks. A restarted worker
+        # passes the last bar it streamed to skip the warm-up batch.
         while True:
             try:
                 response = requests.post(
@@ -144,34 +158,35 @@ class TradingBot:
                     json={
                         "pair": symbol,
                         "interval": interval,
-                        "limit": 1 if len(self.historical_data) >= 24 else 24,
+                        # One extra bar on warm-up, the newest one is still forming
+                        "limit": 25 if last_end is None else CATCH_UP_BARS,
                     },
                     headers={"Content-Type": "application/json"},
                 )
                 response.raise_for_status()
-                data = response.json()
-                last_data = data[-1]
-                if len(self.historical_data) < 24:
-                    data = pd.DataFrame(data)
-                    data.drop(
-                        ["open", "startTime", "high", "low", "volume"],
-                        inplace=True,
-                        axis=1,
-                    )
-                    for i in range(len(data)):
-                        yield {
-                            "close": float(data.iloc[i]["close"]),
-                            "date": pd.to_datetime(
-                                int(last_data["endTime"]), unit="ms"
-                            ).strftime("%Y-%m-%d %H:%M:%S"),
-                        }
-                else:
-                    yield {
-                        "close": float(last_data["close"]),
-                        "date": pd.to_datetime(
-                            int(last_data["endTime"]), unit="ms"
-                        ).strftime("%Y-%m-%d %H:%M:%S"),
-                    }
+                data = pd.DataFrame(response.json(), columns=["endTime", "close"])
+                data = data.apply(pd.to_numeric).drop_duplicates("endTime", keep="last")
+                data = data.sort_values("endTime")
+                end_times = data["endTime"].to_numpy(dtype="int64")
+                closes = data["close"].to_numpy(dtype="float64")
+
+                # The newest kline is usually still forming; streaming its partial
+                # close would freeze it, as the final close never passes last_end
+                closed = end_times <= int(time.time() * 1000)
+                end_times, closes = end_times[closed], closes[closed]
+
+                # Polls overlap, only bars newer than the last one streamed go out
+                if last_end is not None:
+                    fresh = end_times > last_end
+                    end_times, closes = end_times[fresh], closes[fresh]
+                    gaps = find_gaps(np.append(last_end, end_times), step)
+                    if len(gaps):
+                        print(f"Missed {gaps['missing'].sum()} bars since {last_end}")
+
+                for end_time, close in zip(end_times, closes):
+                    yield {"close": float(close), "date": int(end_time)}
+                if len(end_times):
+                    last_end = int(end_times[-1])
             except requests.exceptions.HTTPError as err:
                 print(f"HTTP Error: {err}")
                 print(f"Failed {response.status_code}: {response.text}")
@@ -307,6 +322,10 @@ class TradingBot:
         if signal == "buy":
             if self.balance - risk < 0:
                 return
+            blocked = self.risk_guard.check_order(risk / close, close, self.position)
+            if blocked:
+                print(f"Order blocked by risk guard: {blocked}")
+                return
             self.position += risk / close
             self.entry_price = close
             self.balance -= risk
@@ -327,6 +346,15 @@ class TradingBot:
                     except Exception as E:
                         ic(E)
 
+    def flatten_all(self):
+        # Kill switch: book the simulated position at the last close and exit
+        self.balance += self.position * self.last_close
+        self.position = 0
+        did_close = self.close_all()
+        if did_close:
+            with open("./logs.csv", "a") as f:
+                f.write(json.dumps(did_close, separators=(",", ":")))
+
     def run(self):
         for data in self.fetch_real_time_data():
             if data is None:
@@ -334,12 +362,15 @@ class TradingBot:
             close = data["close"]
             date = data["date"]
 
+            self.last_close = close
+            self.risk_guard.update_equity(self.balance + self.position * close)
+
             metrics = self.calculate_metrics(close)
             if metrics is None:
                 continue
 
-            signal = self.mean_reversion_strategy(close, metrics, date, risk=30)
-            self.execute_trade(signal, close, risk=30)
+            signal = self.mean_reversion_strategy(close, metrics, date, risk=RISK)
+            self.execute_trade(signal, close, risk=RISK)
 
             final_balance = self.balance + self.position * close
             profit_loss = final_balance - self.initial_balance
@@ -356,5 +387,10 @@ class TradingBot:
 
 
 if __name__ == "__main__":
-    bot = TradingBot()
-    bot.run()
+    if "--workers" in sys.argv:
+        from workers import run_workers
+
+        run_workers()
+    else:
+        bot = TradingBot()
+        bot.run()
@@ -0,0 +1,288 @@
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from backtest import SIGNAL_CODES
+
+RING_CAPACITY = 1024
+TICK_FIELDS = ["seq", "close", "end_time", "t_ingest"]
+ORDER_FIELDS = ["seq", "signal", "close", "t_ingest", "t_signal"]
+STATE_FIELDS = [
+    "initialized",
+    "balance",
+    "position",
+    "killed",
+    "high_water",
+    "equity_floor",
+]
+POLL_INTERVAL = 0.0005  # seconds between polls of an empty ring
+LATENCY_REPORT_EVERY = 20  # orders
+WARMUP_BARS = 24  # rolling window of TradingBot.calculate_metrics
+
+
+class RingBuffer:
+    """
+    Single-producer single-consumer ring of fixed-width float64 records in
+    shared memory.
+
+    The two int64 header slots hold the write and read counters. The producer
+    only ever writes `head` and the consumer only `tail`, each after the
+    record itself, so neither side takes a lock. The counters live in shared
+    memory too, which lets a restarted worker pick up where it left off.
+    """
+
+    def __init__(self, name, width, capacity=RING_CAPACITY, create=False):
+        size = 16 + capacity * width * 8
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+        self.name = self.shm.name
+        self.width = width
+        self.capacity = capacity
+        self.counters = np.ndarray((2,), dtype=np.int64, buffer=self.shm.buf)
+        self.slots = np.ndarray(
+            (capacity, width), dtype=np.float64, buffer=self.shm.buf, offset=16
+        )
+        if create:
+            self.counters[:] = 0
+
+    def push(self, record):
+        head = int(self.counters[0])
+        if head - int(self.counters[1]) >= self.capacity:
+            return False  # consumer is a full ring behind, drop the record
+        self.slots[head % self.capacity] = record
+        self.counters[0] = head + 1
+        return True
+
+    def pop(self):
+        tail = int(self.counters[1])
+        if tail == int(self.counters[0]):
+            return None
+        record = self.slots[tail % self.capacity].copy()
+        self.counters[1] = tail + 1
+        return record
+
+    def pop_wait(self):
+        while True:
+            record = self.pop()
+            if record is not None:
+                return record
+            time.sleep(POLL_INTERVAL)
+
+    def close(self):
+        # Drop the numpy views first, SharedMemory refuses to close while exported
+        del self.counters, self.slots
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+def market_data_worker(ticks_name):
+    from run import TradingBot
+
+    ticks = RingBuffer(ticks_name, len(TICK_FIELDS))
+    bot = TradingBot()
+    seq = int(ticks.counters[0])
+    # After a restart, resume after the newest bar already in the ring
+    last_end = None
+    if seq:
+        last_end = int(ticks.slots[(seq - 1) % ticks.capacity][2])
+    for data in bot.fetch_real_time_data(last_end):
+        if data is None:
+            continue
+        seq += 1
+        record = [seq, data["close"], data["date"], time.monotonic_ns()]
+        if not ticks.push(record):
+            print(f"Tick ring full, dropped tick {seq}")
+
+
+def consumed_ticks(ticks, count):
+    """(close, end_time) of up to `count` ticks already popped from the ring."""
+    tail = int(ticks.counters[1])
+    indices = np.arange(max(0, tail - count), tail)
+    records = ticks.slots[indices % ticks.capacity].copy()
+    # Slots the producer has lapsed since hold newer ticks, leave them out
+    intact = indices >= int(ticks.counters[0]) - ticks.capacity
+    return [(close, end_time) for _, close, end_time, _ in records[intact]]
+
+
+def strategy_worker(ticks_name, orders_name):
+    from run import RISK, TradingBot
+
+    ticks = RingBuffer(ticks_name, len(TICK_FIELDS))
+    orders = RingBuffer(orders_name, len(ORDER_FIELDS))
+    bot = TradingBot()
+    last_end = -1
+    for close, end_time in consumed_ticks(ticks, WARMUP_BARS):
+        # Restarted: rebuild the metrics window from ticks the last run consumed
+        bot.calculate_metrics(close)
+        last_end = end_time
+    while True:
+        seq, close, end_time, t_ingest = ticks.pop_wait()
+        if end_time <= last_end:
+            continue  # replayed or out-of-order bar, it is already in the window
+        last_end = end_time
+        metrics = bot.calculate_metrics(close)
+        signal = "hold"
+        if metrics is not None:
+            signal = bot.mean_reversion_strategy(
+                close, metrics, int(end_time), risk=RISK
+            )
+        # Holds go out too: execution marks equity and checks drawdown every tick
+        record = [seq, SIGNAL_CODES[signal], close, t_ingest, time.monotonic_ns()]
+        if not orders.push(record):
+            print(f"Order ring full, dropped {signal} for tick {int(seq)}")
+
+
+def execution_worker(orders_name, state_name):
+    from run import RISK, TradingBot
+
+    orders = RingBuffer(orders_name, len(ORDER_FIELDS))
+    state_shm = shared_memory.SharedMemory(name=state_name)
+    state = np.ndarray((len(STATE_FIELDS),), dtype=np.float64, buffer=state_shm.buf)
+    signals = {code: signal for signal, code in SIGNAL_CODES.items()}
+
+    bot = TradingBot()
+    guard = bot.risk_guard
+    if state[0]:
+        # Restarted after a crash: carry on from the last booked balance and keep
+        # the kill switch and high-water mark, or a tripped guard would re-arm
+        _, bot.balance, bot.position, killed, high_water, floor = map(float, state)
+        guard.killed = bool(killed)
+        guard.high_water = None if np.isnan(high_water) else high_water
+        guard.equity_floor = floor
+
+    def save_state():
+        high_water = np.nan if guard.high_water is None else guard.high_water
+        state[:] = [
+            1,
+            bot.balance,
+            bot.position,
+            guard.killed,
+            high_water,
+            guard.equity_floor,
+        ]
+
+    def flatten_and_save():
+        # The guard sets `killed` before flattening, persist it before close_all runs
+        save_state()
+        bot.flatten_all()
+
+    guard.flatten = flatten_and_save
+
+    latency = {"tick->signal": [], "tick->dispatch": [], "tick->order done": []}
+    while True:
+        seq, code, close, t_ingest, t_signal = orders.pop_wait()
+        t_dispatch = time.monotonic_ns()
+        bot.last_close = close
+        guard.update_equity(bot.balance + bot.position * close)
+        if code == SIGNAL_CODES["hold"]:
+            save_state()
+            continue
+        bot.execute_trade(signals[int(code)], close, risk=RISK)
+        t_done = time.monotonic_ns()
+        save_state()
+
+        latency["tick->signal"].append(t_signal - t_ingest)
+        latency["tick->dispatch"].append(t_dispatch - t_ingest)
+        latency["tick->order done"].append(t_done - t_ingest)
+        if len(latency["tick->order done"]) >= LATENCY_REPORT_EVERY:
+            report_latency(latency)
+            for samples in latency.values():
+                samples.clear()
+
+
+def report_latency(latency):
+    # Nanoseconds in, milliseconds out; monotonic_ns is comparable across processes
+    for label, samples in latency.items():
+        p50, p95, p99 = np.percentile(np.asarray(samples) / 1e6, [50, 95, 99])
+        print(
+            f"{label} latency over {len(samples)} orders: "
+            f"p50={p50:.3f}ms p95={p95:.3f}ms p99={p99:.3f}ms"
+        )
+
+
+class Supervisor:
+    """
+    Starts the workers and restarts any that exit, with a capped exponential
+    backoff. Restarts are scheduled rather than slept on, so one worker's
+    backoff never holds up watching the others, and a worker that stays up
+    for `healthy_uptime` seconds gets its backoff reset.
+    """
+
+    def __init__(self, specs, max_backoff=30, healthy_uptime=300):
+        self.specs = specs  # name -> (target, args)
+        self.max_backoff = max_backoff
+        self.healthy_uptime = healthy_uptime
+        self.processes = {}
+        self.started_at = {}
+        self.next_restart_at = {}
+        self.restarts = {name: 0 for name in specs}
+
+    def start(self, name):
+        target, args = self.specs[name]
+        process = mp.Process(target=target, args=args, name=name, daemon=True)
+        process.start()
+        self.processes[name] = process
+        self.started_at[name] = time.monotonic()
+        print(f"Started {name} worker (pid {process.pid})")
+
+    def check(self):
+        now = time.monotonic()
+        for name, process in self.processes.items():
+            if process.is_alive():
+                if now - self.started_at[name] >= self.healthy_uptime:
+                    self.restarts[name] = 0
+                continue
+            if name in self.next_restart_at:
+                if now >= self.next_restart_at[name]:
+                    del self.next_restart_at[name]
+                    self.start(name)
+                continue
+            self.restarts[name] += 1
+            backoff = min(2 ** (self.restarts[name] - 1), self.max_backoff)
+            self.next_restart_at[name] = now + backoff
+            print(
+                f"{name} worker exited with code {process.exitcode}, "
+                f"restart #{self.restarts[name]} in {backoff}s"
+            )
+
+    def run(self, poll_interval=0.5):
+        for name in self.specs:
+            self.start(name)
+        while True:
+            time.sleep(poll_interval)
+            self.check()
+
+    def stop(self):
+        for process in self.processes.values():
+            process.terminate()
+        for process in self.processes.values():
+            process.join(timeout=5)
+
+
+def run_workers():
+    ticks = RingBuffer(None, len(TICK_FIELDS), create=True)
+    orders = RingBuffer(None, len(ORDER_FIELDS), create=True)
+    state_shm = shared_memory.SharedMemory(create=True, size=len(STATE_FIELDS) * 8)
+    state_shm.buf[:] = bytes(state_shm.size)
+
+    supervisor = Supervisor(
+        {
+            "market-data": (market_data_worker, (ticks.name,)),
+            "strategy": (strategy_worker, (ticks.name, orders.name)),
+            "execution": (execution_worker, (orders.name, state_shm.name)),
+        }
+    )
+    try:
+        supervisor.run()
+    except KeyboardInterrupt:
+        print("Shutting down workers")
+    finally:
+        supervisor.stop()
+        for ring in (ticks, orders):
+            ring.close()
+            ring.unlink()
+        state_shm.close()
+        state_shm.unlink()